@@ -0,0 +1,122 @@
+"""Benchmark parsing and serializing verbose transcriptions.
+
+Compares ``CompactTranscription`` with the Pydantic ``VerboseTranscriptionResponse`` on a
+synthetic transcript and reports the best time and the peak (tracemalloc) memory of each step.
+
+Usage:
+    uv run python scripts/bench_transcription.py [--hours 1] [--repeat 50]
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from bericht_backend.models.compact_transcription import CompactTranscription
+from bericht_backend.models.transcription_response import VerboseTranscriptionResponse
+
+WORDS_PER_MINUTE = 150
+WORDS_PER_SEGMENT = 15
+TOKENS_PER_SEGMENT = 25
+
+
+def synthetic_transcript(hours: float, seed: int = 0) -> bytes:
+    """Generate a ``verbose_json`` body for the given length of speech."""
+    rng = random.Random(seed)  # noqa: S311
+    word_count = int(hours * 60 * WORDS_PER_MINUTE)
+    seconds_per_word = 60 / WORDS_PER_MINUTE
+
+    words: list[dict[str, Any]] = [
+        {
+            "start": round(i * seconds_per_word, 2),
+            "end": round((i + 0.9) * seconds_per_word, 2),
+            "word": f" wort{i}",
+            "probability": round(rng.random(), 4),
+            "speaker": None,
+        }
+        for i in range(word_count)
+    ]
+    segments: list[dict[str, Any]] = []
+    for segment_id, begin in enumerate(range(0, word_count, WORDS_PER_SEGMENT)):
+        segment_words = words[begin : begin + WORDS_PER_SEGMENT]
+        segments.append({
+            "id": segment_id,
+            "seek": int(segment_words[0]["start"] * 100),
+            "start": segment_words[0]["start"],
+            "end": segment_words[-1]["end"],
+            "text": "".join(word["word"] for word in segment_words),
+            "tokens": [rng.randrange(50_000) for _ in range(TOKENS_PER_SEGMENT)],
+            "temperature": 0.0,
+            "avg_logprob": round(-rng.random(), 4),
+            "compression_ratio": 1.4,
+            "no_speech_prob": 0.01,
+            "words": segment_words,
+            "speaker": None,
+        })
+
+    return json.dumps({
+        "task": "transcribe",
+        "language": "de",
+        "duration": word_count * seconds_per_word,
+        "text": "".join(segment["text"] for segment in segments),
+        "words": words,
+        "segments": segments,
+    }).encode()
+
+
+def measure(step: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return the best time in ms and the peak memory in MB of the step."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        _ = step()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    _ = step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--hours", type=float, default=1.0, help="Length of the synthetic transcript")
+    _ = parser.add_argument("--repeat", type=int, default=50, help="Number of timed runs per step")
+    args = parser.parse_args()
+
+    raw = synthetic_transcript(args.hours)
+    compact = CompactTranscription.from_json(raw)
+    model = VerboseTranscriptionResponse.model_validate_json(raw)
+    assert json.loads(compact.to_json_bytes()) == json.loads(model.model_dump_json())  # noqa: S101
+
+    steps: list[tuple[str, Callable[[], object]]] = [
+        ("Pydantic: model_validate_json", lambda: VerboseTranscriptionResponse.model_validate_json(raw)),
+        ("Pydantic: model_dump_json", model.model_dump_json),
+        (
+            "Pydantic: parse + serialize",
+            lambda: VerboseTranscriptionResponse.model_validate_json(raw).model_dump_json(),
+        ),
+        ("Compact: from_json", lambda: CompactTranscription.from_json(raw)),
+        ("Compact: to_json_bytes", compact.to_json_bytes),
+        ("Compact: parse + serialize", lambda: CompactTranscription.from_json(raw).to_json_bytes()),
+    ]
+
+    print(
+        f"{args.hours:g} h transcript: {len(compact.words)} words, {len(compact.segments)} segments, "
+        f"{len(raw) / 1_000_000:.1f} MB JSON"
+    )
+    print(f"{'Step':<32} {'Time (ms)':>10} {'Peak (MB)':>10}")
+    for name, step in steps:
+        elapsed, peak = measure(step, args.repeat)
+        print(f"{name:<32} {elapsed:>10.1f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,74 @@
+import secrets
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 from http import HTTPStatus
 from typing import Annotated
 
 import truststore
-from fastapi import FastAPI, Form, HTTPException, UploadFile
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, Form, Header, HTTPException, Query, UploadFile
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from llm_facade.llm_facade import LLMFacade
 from llm_facade.qwen3 import QwenVllm
 
 from bericht_backend.config import Configuration
+from bericht_backend.models.compact_transcription import MalformedTranscriptionError
 from bericht_backend.models.generate_title_input import GenerateTitleInput
 from bericht_backend.models.generate_title_response import GenerateTitleResponse
 from bericht_backend.models.log_response import LogEntry, LogResponse
+from bericht_backend.models.profile_format import ProfileFormat
+from bericht_backend.models.response_format import ResponseFormat
 from bericht_backend.models.transcription_response import TranscriptionResponse
 from bericht_backend.services.mail_services import send_email
 from bericht_backend.services.title_generation_service import TitleGenerationService
-from bericht_backend.services.whisper_services import speech_to_text
+from bericht_backend.services.title_precompute_service import TitlePrecomputeService
+from bericht_backend.services.whisper_services import (
+    speech_to_subtitles,
+    speech_to_text,
+    speech_to_text_verbose,
+    whisper_pool,
+)
 from bericht_backend.utils.logger import InMemoryLogHandler, get_logger, init_logger
+from bericht_backend.utils.profiling import (
+    EventLoopStallMonitor,
+    ProfilerBusyError,
+    ProfilingMiddleware,
+    ProfilingSession,
+    RequestProfiler,
+)
 
 truststore.inject_into_ssl()
 
 init_logger()
 logger = get_logger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(docs_url=None)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Start the Whisper health checks with the app and release background work on shutdown."""
+    await whisper_pool.start()
+    if loop_stall_monitor is not None:
+        await loop_stall_monitor.start()
+    yield
+    if loop_stall_monitor is not None:
+        await loop_stall_monitor.close()
+    await whisper_pool.close()
+    if title_precompute_service is not None:
+        await title_precompute_service.close()
+
 
 config = Configuration.from_env()
 
+request_profiler = RequestProfiler()
+loop_stall_monitor = (
+    EventLoopStallMonitor(config.loop_stall_threshold_ms / 1000) if config.loop_stall_threshold_ms else None
+)
+
+# Initialize FastAPI app
+app = FastAPI(docs_url=None, lifespan=lifespan)
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+
 print(config)
 
 llm = QwenVllm(config=config, logger=logger)
@@ -36,13 +76,41 @@ llm_facade = LLMFacade(llm)
 
 title_generation_service = TitleGenerationService(llm_facade)
 
-
-@app.post("/stt")
-async def stt(audio_file: UploadFile) -> TranscriptionResponse:
+# Opt-in: generate the title as soon as a transcription is done, /title then usually returns immediately
+title_precompute_service = (
+    TitlePrecomputeService(
+        title_generation_service,
+        max_concurrency=config.title_precompute_concurrency,
+        ttl_seconds=config.title_precompute_ttl_seconds,
+    )
+    if config.title_precompute
+    else None
+)
+
+SUPPORTED_RESPONSE_FORMATS = (ResponseFormat.JSON, ResponseFormat.VERBOSE_JSON, ResponseFormat.SRT, ResponseFormat.VTT)
+
+
+@app.post(
+    "/stt",
+    response_model=TranscriptionResponse,
+    responses={200: {"content": {"text/plain": {}}, "description": "JSON, verbose JSON, SRT or VTT transcription"}},
+)
+async def stt(
+    audio_file: UploadFile,
+    response_format: Annotated[ResponseFormat, Form()] = ResponseFormat.JSON,
+) -> TranscriptionResponse | Response:
     """
     Endpoint to submit a transcription task.
+
+    With ``response_format=verbose_json`` the response contains segment and word timestamps,
+    ``srt`` and ``vtt`` return subtitles as plain text.
     """
 
+    if response_format not in SUPPORTED_RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail=f"Unsupported response format: {response_format.value}"
+        )
+
     if audio_file.content_type is None:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Content type of the audio file is None")
 
@@ -53,13 +121,33 @@ async def stt(audio_file: UploadFile) -> TranscriptionResponse:
     audio_data = await audio_file.read()
 
     # Submit the transcription task
+    if response_format == ResponseFormat.VERBOSE_JSON:
+        # Serialize the compact transcription directly instead of validating every word with Pydantic
+        try:
+            verbose_transcription = await speech_to_text_verbose(audio_data)
+        except MalformedTranscriptionError as e:
+            logger.exception("Malformed verbose transcription from Whisper", field=e.field)
+            raise HTTPException(status_code=HTTPStatus.BAD_GATEWAY, detail=str(e)) from e
+        if title_precompute_service is not None:
+            title_precompute_service.schedule(verbose_transcription.text)
+        return Response(content=verbose_transcription.to_json_bytes(), media_type="application/json")
+
+    if response_format in (ResponseFormat.SRT, ResponseFormat.VTT):
+        subtitles = await speech_to_subtitles(audio_data, response_format)
+        return PlainTextResponse(subtitles)
+
     transcription = await speech_to_text(audio_data)
+    if title_precompute_service is not None:
+        title_precompute_service.schedule(transcription.text)
     return transcription
 
 
 @app.post("/title")
 async def generate_title(request_body: GenerateTitleInput) -> GenerateTitleResponse:
-    title = title_generation_service.generate_title(request_body.text)
+    if title_precompute_service is not None:
+        title = await title_precompute_service.get_title(request_body.text)
+    else:
+        title = title_generation_service.generate_title(request_body.text)
     return GenerateTitleResponse(title=title)
 
 
@@ -154,6 +242,61 @@ async def get_logs(
     return LogResponse(logs=logs, count=len(logs), from_timestamp=from_time, to_timestamp=to_time, level_filter=level)
 
 
+def require_admin(x_admin_token: Annotated[str | None, Header()] = None) -> None:
+    """
+    Dependency that only lets requests with the configured admin token through.
+
+    The admin endpoints are disabled if no ADMIN_TOKEN is configured.
+    """
+    if config.admin_token is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Admin endpoints are disabled")
+
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, config.admin_token.get_secret_value()):
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="Invalid admin token")
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def profile(
+    seconds: Annotated[float, Query(gt=0, le=300)] = 30,
+    profile_format: Annotated[ProfileFormat, Query(alias="format")] = ProfileFormat.PSTATS,
+    fraction: Annotated[float | None, Query(gt=0, le=1)] = None,
+    path: str | None = None,
+) -> Response:
+    """
+    Endpoint to profile the application for a time window.
+
+    Args:
+        seconds: Length of the profiling window
+        profile_format: ``pstats`` for cProfile statistics or ``collapsed`` for sampled stacks (flame graphs)
+        fraction: Only profile this fraction of requests; without it everything running is profiled.
+            Requires the ``collapsed`` format.
+        path: Only profile requests whose path starts with this prefix (requires ``fraction``)
+
+    Returns:
+        The profile as a file download
+    """
+    if fraction is not None and profile_format == ProfileFormat.PSTATS:
+        # cProfile records every thread, so it cannot be limited to the selected requests
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Request sampling requires the collapsed format")
+    if path is not None and fraction is None:
+        # Without a fraction the whole event loop is recorded, a path filter would be silently ignored
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="The path filter requires a fraction")
+
+    session = ProfilingSession(profile_format, request_fraction=fraction, path_prefix=path)
+    try:
+        result = await request_profiler.profile(seconds, session)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail="Another profiler is already running") from e
+
+    if profile_format == ProfileFormat.PSTATS:
+        return Response(
+            content=result,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": "attachment; filename=profile.pstats"},
+        )
+    return PlainTextResponse(result, headers={"Content-Disposition": "attachment; filename=profile.folded"})
+
+
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
@@ -7,13 +7,25 @@ import os
 
 from dotenv import load_dotenv
 from llm_facade.llm_config import LLMConfig
-from pydantic import Field
+from pydantic import Field, SecretStr
 
 
 class Configuration(LLMConfig):
     """Application settings loaded from environment variables."""
 
-    whisper_api: str = Field(title="Whisper API URL")
+    whisper_apis: list[str] = Field(title="Whisper API URLs")
+    whisper_health_check_path: str = Field(default="/readyz", title="Whisper health check path")
+    whisper_health_check_interval: float = Field(default=10.0, gt=0, title="Seconds between Whisper health checks")
+    whisper_max_failures: int = Field(default=3, ge=1, title="Consecutive failures before a Whisper backend is ejected")
+    whisper_ejection_seconds: float = Field(default=30.0, gt=0, title="Seconds an ejected Whisper backend is skipped")
+    whisper_hedge_percentile: float | None = Field(
+        default=None, gt=0, lt=100, title="Latency percentile after which Whisper requests are hedged"
+    )
+    title_precompute: bool = Field(default=False, title="Generate titles in the background after transcription")
+    title_precompute_concurrency: int = Field(default=2, title="Maximum number of titles generated in the background")
+    title_precompute_ttl_seconds: float = Field(default=300.0, title="Seconds a precomputed title is kept")
+    admin_token: SecretStr | None = Field(default=None, title="Token required for the admin endpoints")
+    loop_stall_threshold_ms: float | None = Field(default=None, gt=0, title="Log event loop stalls longer than this")
 
     @classmethod
     def from_env(cls) -> "Configuration":
@@ -27,11 +39,28 @@ class Configuration(LLMConfig):
         """
         _ = load_dotenv()  # Load .env file if present
 
-        whisper_api = os.getenv("WHISPER_API", "")
+        # WHISPER_API accepts a comma-separated list of endpoints
+        whisper_apis = [url.strip() for url in os.getenv("WHISPER_API", "").split(",") if url.strip()]
+        whisper_hedge_percentile = os.getenv("WHISPER_HEDGE_PERCENTILE")
+        loop_stall_threshold_ms = os.getenv("LOOP_STALL_THRESHOLD_MS")
+        admin_token = os.getenv("ADMIN_TOKEN")
         llm_api = os.getenv("LLM_API", "")
         llm_api_key = os.getenv("LLM_API_KEY", "")
         llm_model = os.getenv("LLM_MODEL", "cortecs/Llama-3.3-70B-Instruct-FP8-Dynamic")
 
         return cls(
-            whisper_api=whisper_api, openai_api_base_url=llm_api, openai_api_key=llm_api_key, llm_model=llm_model
+            whisper_apis=whisper_apis,
+            whisper_health_check_path=os.getenv("WHISPER_HEALTH_CHECK_PATH", "/readyz"),
+            whisper_health_check_interval=float(os.getenv("WHISPER_HEALTH_CHECK_INTERVAL", "10")),
+            whisper_max_failures=int(os.getenv("WHISPER_MAX_FAILURES", "3")),
+            whisper_ejection_seconds=float(os.getenv("WHISPER_EJECTION_SECONDS", "30")),
+            whisper_hedge_percentile=float(whisper_hedge_percentile) if whisper_hedge_percentile else None,
+            title_precompute=os.getenv("TITLE_PRECOMPUTE", "false").lower() in ("1", "true", "yes"),
+            title_precompute_concurrency=int(os.getenv("TITLE_PRECOMPUTE_CONCURRENCY", "2")),
+            title_precompute_ttl_seconds=float(os.getenv("TITLE_PRECOMPUTE_TTL_SECONDS", "300")),
+            admin_token=SecretStr(admin_token) if admin_token else None,
+            loop_stall_threshold_ms=float(loop_stall_threshold_ms) if loop_stall_threshold_ms else None,
+            openai_api_base_url=llm_api,
+            openai_api_key=llm_api_key,
+            llm_model=llm_model,
         )
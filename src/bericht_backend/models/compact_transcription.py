@@ -0,0 +1,289 @@
+"""Array-backed representation of a verbose Whisper transcription.
+
+A one-hour transcript contains tens of thousands of words. Validating each of them as a
+Pydantic ``Word`` keeps one object (plus a ``__dict__``) per word alive, and returning the
+model from an endpoint sends it through FastAPI's ``jsonable_encoder``, which walks every
+word in Python. ``CompactTranscription`` stores words and segments column-wise in ``array``
+buffers instead and is parsed and serialized with pydantic's Rust JSON codec.
+"""
+
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import accumulate, chain
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from bericht_backend.models.transcription_response import VerboseTranscriptionResponse
+
+_json_object: TypeAdapter[dict[str, Any]] = TypeAdapter(dict[str, Any])
+
+
+class MalformedTranscriptionError(ValueError):
+    """Raised when a ``verbose_json`` body lacks a field or has a value of the wrong type."""
+
+    def __init__(self, field: str):
+        super().__init__(f"Missing or invalid field in verbose transcription: {field}")
+        self.field: str = field
+
+
+@contextmanager
+def _field(name: str) -> Iterator[None]:
+    """Turn errors raised while reading the given field into a ``MalformedTranscriptionError``."""
+    try:
+        yield
+    except (KeyError, TypeError, AttributeError, ValueError, OverflowError) as e:
+        raise MalformedTranscriptionError(name) from e
+
+
+def _strings[T: str | None](values: list[T], optional: bool = False) -> list[T]:
+    """
+    Check that all values are strings (or None if ``optional``).
+
+    Raises:
+        TypeError: If a value has another type
+    """
+    if not all(isinstance(value, str) or (optional and value is None) for value in values):
+        raise TypeError
+    return values
+
+
+def _floats() -> array[float]:
+    return array("d")
+
+
+def _ints() -> array[int]:
+    return array("q")
+
+
+class WordColumns:
+    """Word timestamps stored column-wise."""
+
+    __slots__ = ("ends", "probabilities", "speakers", "starts", "texts")
+
+    def __init__(self):
+        self.starts: array[float] = _floats()
+        self.ends: array[float] = _floats()
+        self.probabilities: array[float] = _floats()
+        self.texts: list[str] = []
+        self.speakers: list[str | None] = []
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def extend(self, words: list[dict[str, Any]]) -> None:
+        """Append words given as ``verbose_json`` dicts."""
+        # One comprehension per column is much faster than appending word by word
+        with _field("start"):
+            self.starts.extend([word["start"] for word in words])
+        with _field("end"):
+            self.ends.extend([word["end"] for word in words])
+        with _field("probability"):
+            self.probabilities.extend([word["probability"] for word in words])
+        with _field("word"):
+            self.texts.extend(_strings([word["word"] for word in words]))
+        with _field("speaker"):
+            self.speakers.extend(_strings([word.get("speaker") for word in words], optional=True))
+
+    def to_dicts(self, begin: int = 0, end: int | None = None) -> list[dict[str, Any]]:
+        """Convert the words in ``[begin, end)`` back to ``verbose_json`` dicts."""
+        end = len(self) if end is None else end
+        return [
+            {"start": s, "end": e, "word": w, "probability": p, "speaker": sp}
+            for s, e, w, p, sp in zip(
+                self.starts[begin:end],
+                self.ends[begin:end],
+                self.texts[begin:end],
+                self.probabilities[begin:end],
+                self.speakers[begin:end],
+                strict=True,
+            )
+        ]
+
+
+class SegmentColumns:
+    """
+    Segments stored column-wise.
+
+    The tokens of all segments are stored in one flat array, segment ``i`` owns
+    ``tokens[token_offsets[i]:token_offsets[i + 1]]``. Words work the same way
+    through ``word_offsets`` and index into the transcription's ``WordColumns``.
+    """
+
+    __slots__ = (
+        "avg_logprobs",
+        "compression_ratios",
+        "ends",
+        "ids",
+        "no_speech_probs",
+        "seeks",
+        "speakers",
+        "starts",
+        "temperatures",
+        "texts",
+        "token_offsets",
+        "tokens",
+        "word_offsets",
+    )
+
+    def __init__(self):
+        self.ids: array[int] = _ints()
+        self.seeks: array[int] = _ints()
+        self.starts: array[float] = _floats()
+        self.ends: array[float] = _floats()
+        self.temperatures: array[float] = _floats()
+        self.avg_logprobs: array[float] = _floats()
+        self.compression_ratios: array[float] = _floats()
+        self.no_speech_probs: array[float] = _floats()
+        self.texts: list[str] = []
+        self.speakers: list[str | None] = []
+        self.tokens: array[int] = _ints()
+        self.token_offsets: array[int] = array("q", [0])
+        self.word_offsets: array[int] = array("q", [0])
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def extend(self, segments: list[dict[str, Any]], word_counts: list[int]) -> None:
+        """Append segments given as ``verbose_json`` dicts together with the number of words of each segment."""
+        columns: list[tuple[str, array[int] | array[float]]] = [
+            ("id", self.ids),
+            ("seek", self.seeks),
+            ("start", self.starts),
+            ("end", self.ends),
+            ("temperature", self.temperatures),
+            ("avg_logprob", self.avg_logprobs),
+            ("compression_ratio", self.compression_ratios),
+            ("no_speech_prob", self.no_speech_probs),
+        ]
+        for name, column in columns:
+            with _field(name):
+                column.extend([segment[name] for segment in segments])
+        with _field("text"):
+            self.texts.extend(_strings([segment["text"] for segment in segments]))
+        with _field("speaker"):
+            self.speakers.extend(_strings([segment.get("speaker") for segment in segments], optional=True))
+
+        token_base, word_base = self.token_offsets[-1], self.word_offsets[-1]
+        with _field("tokens"):
+            self.tokens.extend(chain.from_iterable(segment["tokens"] for segment in segments))
+            self.token_offsets.extend(
+                token_base + total for total in accumulate(len(segment["tokens"]) for segment in segments)
+            )
+        self.word_offsets.extend(word_base + total for total in accumulate(word_counts))
+
+
+class CompactTranscription:
+    """
+    Verbose transcription with words and segments stored in arrays.
+
+    Attributes:
+        task: The Whisper task (e.g. "transcribe")
+        language: Detected language
+        duration: Duration of the audio in seconds
+        text: Full transcript
+        words: All words of the transcript
+        segments: All segments of the transcript
+        segment_words: Whether the segments carried their own word lists
+    """
+
+    __slots__ = ("duration", "language", "segment_words", "segments", "task", "text", "words")
+
+    def __init__(self, task: str, language: str, duration: float, text: str):
+        self.task: str = task
+        self.language: str = language
+        self.duration: float = duration
+        self.text: str = text
+        self.words: WordColumns = WordColumns()
+        self.segments: SegmentColumns = SegmentColumns()
+        self.segment_words: bool = False
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "CompactTranscription":
+        """
+        Parse a ``verbose_json`` response of the Whisper API.
+
+        Args:
+            raw: The raw JSON body
+
+        Returns:
+            The compact transcription
+
+        Raises:
+            MalformedTranscriptionError: If the body is not a JSON object ("body") or a field is
+                missing or has a value of the wrong type
+        """
+        # pydantic.ValidationError is a ValueError, so non-JSON bodies are reported as well
+        with _field("body"):
+            data = _json_object.validate_json(raw)
+        with _field("task"):
+            task = _strings([data.get("task", "transcribe")])[0]
+        with _field("language"):
+            language = _strings([data["language"]])[0]
+        with _field("duration"):
+            duration = float(data["duration"])
+        with _field("text"):
+            text = _strings([data["text"]])[0]
+        transcription = cls(task=task, language=language, duration=duration, text=text)
+
+        with _field("segments"):
+            segments: list[dict[str, Any]] = list(data.get("segments") or [])
+            # Words are usually listed both per segment and at the top level; store them only once
+            transcription.segment_words = any(segment.get("words") is not None for segment in segments)
+        with _field("words"):
+            if transcription.segment_words:
+                segment_words = [list(segment.get("words") or []) for segment in segments]
+                words = list(chain.from_iterable(segment_words))
+                word_counts = [len(words) for words in segment_words]
+            else:
+                words = list(data.get("words") or [])
+                word_counts = [0] * len(segments)
+        transcription.words.extend(words)
+        transcription.segments.extend(segments, word_counts)
+
+        return transcription
+
+    def replace_text(self, old: str, new: str) -> None:
+        """Replace ``old`` with ``new`` in the transcript, the segment texts and the words."""
+        self.text = self.text.replace(old, new)
+        self.segments.texts = [text.replace(old, new) for text in self.segments.texts]
+        self.words.texts = [text.replace(old, new) for text in self.words.texts]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the ``verbose_json`` structure."""
+        segments = self.segments
+        token_offsets = segments.token_offsets
+        word_offsets = segments.word_offsets
+        return {
+            "task": self.task,
+            "language": self.language,
+            "duration": self.duration,
+            "text": self.text,
+            "words": self.words.to_dicts(),
+            "segments": [
+                {
+                    "id": segments.ids[i],
+                    "seek": segments.seeks[i],
+                    "start": segments.starts[i],
+                    "end": segments.ends[i],
+                    "text": segments.texts[i],
+                    "tokens": segments.tokens[token_offsets[i] : token_offsets[i + 1]].tolist(),
+                    "temperature": segments.temperatures[i],
+                    "avg_logprob": segments.avg_logprobs[i],
+                    "compression_ratio": segments.compression_ratios[i],
+                    "no_speech_prob": segments.no_speech_probs[i],
+                    "words": self.words.to_dicts(word_offsets[i], word_offsets[i + 1]) if self.segment_words else None,
+                    "speaker": segments.speakers[i],
+                }
+                for i in range(len(segments))
+            ],
+        }
+
+    def to_json_bytes(self) -> bytes:
+        """Serialize to a ``verbose_json`` body without going through ``jsonable_encoder``."""
+        return _json_object.dump_json(self.to_dict())
+
+    def to_verbose_response(self) -> VerboseTranscriptionResponse:
+        """Convert to the Pydantic model. Slow for long transcripts, prefer ``to_json_bytes``."""
+        return VerboseTranscriptionResponse.model_validate(self.to_dict())
@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class ProfileFormat(str, Enum):
+    """
+    Enum representing the possible output formats of the profiling endpoint.
+
+    Attributes:
+        PSTATS: cProfile statistics, readable with ``pstats``, snakeviz or gprof2dot
+        COLLAPSED: Sampled stacks in collapsed format, readable with flamegraph.pl, inferno or speedscope
+    """
+
+    PSTATS = "pstats"
+    COLLAPSED = "collapsed"
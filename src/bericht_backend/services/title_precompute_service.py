@@ -0,0 +1,139 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import time
+from collections import OrderedDict
+
+from bericht_backend.services.title_generation_service import TitleGenerationService
+from bericht_backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _PendingTitle:
+    """A title that is being or has been generated in the background."""
+
+    __slots__ = ("expires_at", "task")
+
+    def __init__(self, task: asyncio.Task[str], expires_at: float):
+        self.task: asyncio.Task[str] = task
+        self.expires_at: float = expires_at
+
+
+class TitlePrecomputeService:
+    """
+    Service for generating titles speculatively, before they are requested.
+
+    Almost every transcription is followed by a title request for the same text, so the
+    title is generated in the background as soon as the transcription is done. The result
+    is kept for a short time, keyed by the text, and a following title request either gets
+    it immediately or waits on the generation that is already running.
+    """
+
+    def __init__(
+        self,
+        title_generation_service: TitleGenerationService,
+        max_concurrency: int = 2,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 256,
+    ):
+        """
+        Initialize the TitlePrecomputeService.
+
+        Args:
+            title_generation_service: The service used to generate the titles
+            max_concurrency: Maximum number of titles generated in the background at the same time
+            ttl_seconds: How long a precomputed title is kept
+            max_entries: Maximum number of precomputed titles kept
+        """
+        self.title_generation_service: TitleGenerationService = title_generation_service
+        self.max_concurrency: int = max_concurrency
+        self.ttl_seconds: float = ttl_seconds
+        self.max_entries: int = max_entries
+        self._titles: OrderedDict[str, _PendingTitle] = OrderedDict()
+        self._running: int = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.strip().encode()).hexdigest()
+
+    def _evict(self) -> None:
+        """Drop expired titles and the oldest ones beyond ``max_entries``."""
+        now = time.monotonic()
+        for key in [key for key, title in self._titles.items() if title.expires_at <= now]:
+            del self._titles[key]
+        while len(self._titles) > self.max_entries:
+            _ = self._titles.popitem(last=False)
+
+    def schedule(self, text: str) -> None:
+        """
+        Start generating the title for the given text in the background.
+
+        Nothing is scheduled if the text is empty, its title is already known or
+        ``max_concurrency`` titles are being generated already; speculative work is
+        dropped under load rather than queued.
+
+        Args:
+            text (str): The text to generate a title for.
+        """
+        if not text.strip():
+            return
+
+        self._evict()
+        key = self._key(text)
+        if key in self._titles:
+            return
+        if self._running >= self.max_concurrency:
+            logger.debug("Skipping title precomputation, concurrency limit reached")
+            return
+
+        self._running += 1
+        task = asyncio.create_task(asyncio.to_thread(self.title_generation_service.generate_title, text))
+        task.add_done_callback(functools.partial(self._on_done, key))
+        self._titles[key] = _PendingTitle(task, time.monotonic() + self.ttl_seconds)
+
+    def _on_done(self, key: str, task: asyncio.Task[str]) -> None:
+        self._running -= 1
+        if task.cancelled() or task.exception() is not None:
+            if not task.cancelled():
+                logger.warning("Title precomputation failed", error=str(task.exception()))
+            # Drop the failed entry so the text can be scheduled again; it may already be replaced
+            pending = self._titles.get(key)
+            if pending is not None and pending.task is task:
+                del self._titles[key]
+
+    async def get_title(self, text: str) -> str:
+        """
+        Get the title for the given text.
+
+        Returns the precomputed title or waits for the one being generated. A precomputed
+        title is served only once, later requests for the same text generate a new one. If
+        there is none, or its generation failed, the title is generated now.
+
+        Args:
+            text (str): The text to generate a title for.
+
+        Returns:
+            str: The generated title.
+        """
+        self._evict()
+        key = self._key(text)
+        pending = self._titles.get(key)
+        if pending is not None:
+            # Failures are logged when the task finishes; fall back to generating the title now
+            with contextlib.suppress(Exception):
+                # Shield the task so a disconnecting client does not cancel it for a retry
+                title = await asyncio.shield(pending.task)
+                # Only consume the entry once it was served; it may have been replaced meanwhile
+                if self._titles.get(key) is pending:
+                    del self._titles[key]
+                return title
+
+        return await asyncio.to_thread(self.title_generation_service.generate_title, text)
+
+    async def close(self) -> None:
+        """Cancel all titles that are still being generated."""
+        for pending in self._titles.values():
+            _ = pending.task.cancel()
+        self._titles.clear()
@@ -0,0 +1,285 @@
+"""Load-balanced pool of Whisper backends.
+
+Requests are routed to the healthy backend with the fewest outstanding requests.
+Backends are health-checked in the background, ejected for a while after repeated
+failures and, optionally, slow requests are hedged on a second backend.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Final
+
+import aiohttp
+from yarl import URL
+
+from bericht_backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_HEALTH_CHECK_TIMEOUT: Final = aiohttp.ClientTimeout(total=5)
+_LATENCY_WINDOW: Final = 200
+_MIN_HEDGE_SAMPLES: Final = 20
+# Floor for the input size so the fixed overhead of tiny clips does not dominate the per-MB latency
+_MIN_INPUT_MB: Final = 0.05
+
+
+def _input_mb(input_bytes: int) -> float:
+    return max(input_bytes / 1_000_000, _MIN_INPUT_MB)
+
+
+class NoWhisperBackendError(aiohttp.ClientError):
+    """Raised when no Whisper backend is left to send a request to."""
+
+
+class WhisperBackend:
+    """State of a single Whisper backend in the pool."""
+
+    def __init__(self, base_url: str, health_check_path: str):
+        """
+        Initialize the backend.
+
+        Args:
+            base_url: The base URL of the Whisper API (e.g. http://host:50001/v1)
+            health_check_path: Absolute path of the health check endpoint on the same host
+        """
+        self.base_url: str = base_url.rstrip("/")
+        self.health_url: str = str(URL(self.base_url).with_path(health_check_path))
+        self.outstanding: int = 0
+        self.healthy: bool = True
+        self.consecutive_failures: int = 0
+        self.ejected_until: float = 0.0
+
+    def is_available(self, now: float) -> bool:
+        """Whether the backend may receive new requests."""
+        return self.healthy and now >= self.ejected_until
+
+    def __repr__(self) -> str:
+        return f"WhisperBackend({self.base_url!r}, outstanding={self.outstanding}, healthy={self.healthy})"
+
+
+class WhisperPool:
+    """
+    Pool of Whisper backends with least-outstanding-requests routing.
+
+    A backend is taken out of rotation when its health check fails (active) or when
+    it fails ``max_failures`` requests in a row (passive ejection for ``ejection_seconds``).
+    If every backend is unavailable the pool falls back to all of them, so a single
+    flaky node degrades to the previous single-backend behaviour instead of failing hard.
+    """
+
+    def __init__(
+        self,
+        base_urls: Iterable[str],
+        health_check_path: str = "/readyz",
+        health_check_interval: float = 10.0,
+        max_failures: int = 3,
+        ejection_seconds: float = 30.0,
+        hedge_percentile: float | None = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            base_urls: Base URLs of the Whisper APIs
+            health_check_path: Path of the health check endpoint, relative to the host root
+            health_check_interval: Seconds between two health check rounds
+            max_failures: Consecutive request failures after which a backend is ejected
+            ejection_seconds: How long an ejected backend is kept out of rotation
+            hedge_percentile: Percentile (e.g. 95) of the latency per MB of input after which
+                a request is hedged on a second backend. None disables hedging.
+        """
+        self.backends: list[WhisperBackend] = [WhisperBackend(url, health_check_path) for url in base_urls if url]
+
+        self.health_check_interval: float = health_check_interval
+        self.max_failures: int = max_failures
+        self.ejection_seconds: float = ejection_seconds
+        self.hedge_percentile: float | None = hedge_percentile
+
+        # Latency in seconds per MB of input, Whisper latency grows with the audio length
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._rotation: itertools.count[int] = itertools.count()
+        self._session: aiohttp.ClientSession | None = None
+        self._health_task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        """Start the background health checks. Only needed when there is more than one backend."""
+        if self._health_task is None and len(self.backends) > 1:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def close(self) -> None:
+        """Stop the health checks and close the shared HTTP session."""
+        if self._health_task is not None:
+            _ = self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    def _pick(self, exclude: set[WhisperBackend]) -> WhisperBackend | None:
+        """Pick the available backend with the fewest outstanding requests."""
+        now = time.monotonic()
+        candidates = [b for b in self.backends if b not in exclude and b.is_available(now)]
+        if not candidates:
+            # Fail open: rather try an unhealthy backend than reject the request
+            candidates = [b for b in self.backends if b not in exclude]
+        if not candidates:
+            return None
+
+        # Rotate the starting point so ties are spread over the backends
+        offset = next(self._rotation) % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        return min(rotated, key=lambda b: b.outstanding)
+
+    def _record_success(self, backend: WhisperBackend, elapsed: float, input_mb: float) -> None:
+        backend.consecutive_failures = 0
+        self._latencies.append(elapsed / input_mb)
+
+    def _record_failure(self, backend: WhisperBackend, error: BaseException) -> None:
+        backend.consecutive_failures += 1
+        logger.warning(
+            "Whisper request failed",
+            backend=backend.base_url,
+            consecutive_failures=backend.consecutive_failures,
+            error=str(error),
+        )
+        if backend.consecutive_failures >= self.max_failures:
+            backend.ejected_until = time.monotonic() + self.ejection_seconds
+            backend.consecutive_failures = 0
+            logger.warning("Ejecting Whisper backend", backend=backend.base_url, seconds=self.ejection_seconds)
+
+    def hedge_delay(self, input_bytes: int) -> float | None:
+        """
+        Delay after which an unfinished request is hedged.
+
+        Args:
+            input_bytes: Size of the request's input (e.g. the audio data)
+
+        Returns:
+            The configured percentile of recent latencies per MB, scaled to the input size,
+            or None if hedging is disabled or there are not enough samples yet.
+        """
+        if self.hedge_percentile is None or len(self.backends) < 2 or len(self._latencies) < _MIN_HEDGE_SAMPLES:
+            return None
+        latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.hedge_percentile / 100), len(latencies) - 1)
+        return latencies[index] * _input_mb(input_bytes)
+
+    async def post[T](
+        self,
+        path: str,
+        build_form: Callable[[], aiohttp.FormData],
+        read_response: Callable[[aiohttp.ClientResponse], Awaitable[T]],
+        input_bytes: int,
+    ) -> T:
+        """
+        Send a POST request to one of the backends.
+
+        Args:
+            path: Path relative to the backend base URL (e.g. /audio/transcriptions)
+            build_form: Factory for the form data; called once per attempt since form data cannot be reused
+            read_response: Coroutine that reads the result from a successful response
+            input_bytes: Size of the input (e.g. the audio data), used to scale latencies for hedging
+
+        Returns:
+            The value returned by ``read_response``.
+
+        Raises:
+            NoWhisperBackendError: If no Whisper backend is configured
+            aiohttp.ClientError: If the request failed on every backend that was tried
+        """
+        tried: set[WhisperBackend] = set()
+        input_mb = _input_mb(input_bytes)
+        delay = self.hedge_delay(input_bytes)
+        if delay is None:
+            return await self._send_with_failover(path, build_form, read_response, input_mb, tried)
+
+        pending: set[asyncio.Task[T]] = {
+            asyncio.create_task(self._send_with_failover(path, build_form, read_response, input_mb, tried))
+        }
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done and len(tried) < len(self.backends):
+                logger.info("Hedging slow Whisper request", delay=round(delay, 3))
+                pending.add(
+                    asyncio.create_task(self._send_with_failover(path, build_form, read_response, input_mb, tried))
+                )
+
+            # Return the first successful result, or the last error if every attempt failed
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = done.pop()
+                if task.exception() is None or (not done and not pending):
+                    return task.result()
+        finally:
+            for task in pending:
+                _ = task.cancel()
+
+    async def _send_with_failover[T](
+        self,
+        path: str,
+        build_form: Callable[[], aiohttp.FormData],
+        read_response: Callable[[aiohttp.ClientResponse], Awaitable[T]],
+        input_mb: float,
+        tried: set[WhisperBackend],
+    ) -> T:
+        """Send the request, failing over to untried backends on connection errors and server errors."""
+        while True:
+            backend = self._pick(tried)
+            if backend is None:
+                raise NoWhisperBackendError
+            tried.add(backend)
+
+            backend.outstanding += 1
+            start = time.monotonic()
+            try:
+                async with self._get_session().post(f"{backend.base_url}{path}", data=build_form()) as response:
+                    response.raise_for_status()
+                    result = await read_response(response)
+            except aiohttp.ClientResponseError as e:
+                if e.status < 500:
+                    # Client errors are not the backend's fault and would fail everywhere
+                    raise
+                self._record_failure(backend, e)
+                if len(tried) >= len(self.backends):
+                    raise
+            except (aiohttp.ClientError, TimeoutError) as e:
+                self._record_failure(backend, e)
+                if len(tried) >= len(self.backends):
+                    raise
+            else:
+                self._record_success(backend, time.monotonic() - start, input_mb)
+                return result
+            finally:
+                backend.outstanding -= 1
+
+    async def check_health(self) -> None:
+        """Run one round of health checks against all backends."""
+        _ = await asyncio.gather(*(self._check_backend(backend) for backend in self.backends))
+
+    async def _check_backend(self, backend: WhisperBackend) -> None:
+        try:
+            async with self._get_session().get(backend.health_url, timeout=_HEALTH_CHECK_TIMEOUT) as response:
+                healthy = response.status < 400
+        except (aiohttp.ClientError, TimeoutError):
+            healthy = False
+
+        if healthy != backend.healthy:
+            logger.info("Whisper backend health changed", backend=backend.base_url, healthy=healthy)
+        backend.healthy = healthy
+
+    async def _health_check_loop(self) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
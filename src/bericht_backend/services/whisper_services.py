@@ -1,18 +1,49 @@
 import uuid
+from collections.abc import Callable
 
 import aiohttp
 from fastapi import APIRouter
 
 from bericht_backend.config import Configuration
+from bericht_backend.models.compact_transcription import CompactTranscription
 from bericht_backend.models.response_format import ResponseFormat
 from bericht_backend.models.transcription_response import TranscriptionResponse
+from bericht_backend.services.whisper_pool import WhisperPool
 
 router = APIRouter()
 
 config = Configuration.from_env()
 
-# BentoML API endpoint
-BENTOML_API_URL = f"{config.whisper_api}/audio/transcriptions"
+whisper_pool = WhisperPool(
+    config.whisper_apis,
+    health_check_path=config.whisper_health_check_path,
+    health_check_interval=config.whisper_health_check_interval,
+    max_failures=config.whisper_max_failures,
+    ejection_seconds=config.whisper_ejection_seconds,
+    hedge_percentile=config.whisper_hedge_percentile,
+)
+
+TRANSCRIPTIONS_PATH = "/audio/transcriptions"
+TIMESTAMP_GRANULARITIES = ("word", "segment")
+
+
+def _build_form(audio_data: bytes, response_format: ResponseFormat) -> Callable[[], aiohttp.FormData]:
+    """Return a factory for the transcription form data of the given audio."""
+    progress_id = uuid.uuid4().hex
+
+    def build_form() -> aiohttp.FormData:
+        # Form data can only be sent once, so each attempt gets a fresh one
+        form_data = aiohttp.FormData()
+        form_data.add_field("file", audio_data, filename="audio.wav")
+        form_data.add_field("progress_id", progress_id)
+        form_data.add_field("response_format", response_format)  # Use the enum value
+        if response_format == ResponseFormat.VERBOSE_JSON:
+            # OpenAI-compatible servers only fill "words" when word timestamps are requested explicitly
+            for granularity in TIMESTAMP_GRANULARITIES:
+                form_data.add_field("timestamp_granularities[]", granularity)
+        return form_data
+
+    return build_form
 
 
 async def speech_to_text(audio_data: bytes) -> TranscriptionResponse:
@@ -21,24 +52,56 @@ async def speech_to_text(audio_data: bytes) -> TranscriptionResponse:
 
     Args:
         audio_data: The binary audio data to transcribe
-        file_format: The format of the audio data
 
     """
-    url = f"{config.whisper_api}/audio/transcriptions"
 
-    # Prepare form data
-    form_data = aiohttp.FormData()
-    form_data.add_field("file", audio_data, filename="audio.wav")
+    async def read_response(response: aiohttp.ClientResponse) -> TranscriptionResponse:
+        return TranscriptionResponse(**await response.json())  # pyright: ignore[reportAny]
+
+    transcription = await whisper_pool.post(
+        TRANSCRIPTIONS_PATH, _build_form(audio_data, ResponseFormat.JSON), read_response, len(audio_data)
+    )
+    transcription.text = transcription.text.replace("ß", "ss")
+    return transcription
+
+
+async def speech_to_text_verbose(audio_data: bytes) -> CompactTranscription:
+    """
+    Transcribes the given audio data with segment and word timestamps.
+
+    Args:
+        audio_data: The binary audio data to transcribe
+
+    Returns:
+        The transcription in its compact, array-backed form
+    """
+
+    async def read_response(response: aiohttp.ClientResponse) -> CompactTranscription:
+        return CompactTranscription.from_json(await response.read())
+
+    transcription = await whisper_pool.post(
+        TRANSCRIPTIONS_PATH, _build_form(audio_data, ResponseFormat.VERBOSE_JSON), read_response, len(audio_data)
+    )
+    transcription.replace_text("ß", "ss")
+    return transcription
 
-    progress_id = uuid.uuid4().hex
-    form_data.add_field("progress_id", progress_id)
 
-    form_data.add_field("response_format", ResponseFormat.JSON)  # Use the enum value
+async def speech_to_subtitles(audio_data: bytes, response_format: ResponseFormat) -> str:
+    """
+    Transcribes the given audio data to subtitles.
+
+    Args:
+        audio_data: The binary audio data to transcribe
+        response_format: Either ResponseFormat.SRT or ResponseFormat.VTT
+
+    Returns:
+        The subtitles as returned by the Whisper API
+    """
 
-    # Send the request
-    async with aiohttp.ClientSession() as session, session.post(url, data=form_data) as response:
-        response.raise_for_status()
-        transcription = TranscriptionResponse(**await response.json())  # pyright: ignore[reportAny]
+    async def read_response(response: aiohttp.ClientResponse) -> str:
+        return await response.text()
 
-        transcription.text = transcription.text.replace("ß", "ss")
-        return transcription
+    subtitles = await whisper_pool.post(
+        TRANSCRIPTIONS_PATH, _build_form(audio_data, response_format), read_response, len(audio_data)
+    )
+    return subtitles.replace("ß", "ss")
@@ -0,0 +1,319 @@
+"""On-demand profiling and event loop stall detection.
+
+Nothing in this module runs unless it is explicitly started: the middleware only checks
+whether a profiling session is active, and the stall monitor is only started when a
+threshold is configured.
+"""
+
+import asyncio
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from bericht_backend.models.profile_format import ProfileFormat
+from bericht_backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Requests to these paths are never sampled, the profiling request itself lasts the whole window
+_EXCLUDED_PATH_PREFIX = "/admin"
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profiling session is started while another one is running."""
+
+
+def _collapse_stack(frame: FrameType | None) -> str:
+    """Format a stack as ``outer;...;inner`` frame names for flame graph tools."""
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _StackSampler:
+    """Samples the stack of one thread at a fixed interval from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id: int = thread_id
+        self.interval: float = interval
+        self.recording: bool = False
+        self.samples: Counter[str] = Counter()
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.recording:
+                self.samples[_collapse_stack(sys._current_frames().get(self.thread_id))] += 1
+
+    def to_collapsed(self) -> bytes:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items() if stack).encode()
+
+
+class ProfilingSession:
+    """
+    A single profiling run.
+
+    The collapsed format samples the stack of the event loop thread only. The pstats format
+    uses cProfile, which records every thread since Python 3.12 (it is built on
+    ``sys.monitoring``), so thread pool work such as ``asyncio.to_thread`` calls shows up as well.
+
+    Without ``request_fraction`` everything is recorded for the whole window. With it, only the
+    given fraction of requests is selected and recording is active while at least one selected
+    request is in flight. Request sampling is only meaningful for the collapsed format, since
+    cProfile would still record the other threads while a selected request is in flight.
+    """
+
+    def __init__(
+        self,
+        profile_format: ProfileFormat,
+        request_fraction: float | None = None,
+        path_prefix: str | None = None,
+        sample_interval: float = 0.005,
+    ):
+        """
+        Initialize the session.
+
+        Args:
+            profile_format: Whether to record deterministic cProfile stats or sampled stacks
+            request_fraction: Fraction of requests to profile, None to profile the whole window
+            path_prefix: Only profile requests whose path starts with this prefix
+            sample_interval: Seconds between two stack samples in the collapsed format
+        """
+        self.profile_format: ProfileFormat = profile_format
+        self.request_fraction: float | None = request_fraction
+        self.path_prefix: str | None = path_prefix
+        self.sample_interval: float = sample_interval
+        self.sampled_requests: int = 0
+        self._credit: float = 0.0
+        self._in_flight: int = 0
+        self._stopped: bool = False
+        self._profile: cProfile.Profile | None = None
+        self._sampler: _StackSampler | None = None
+
+    def start(self) -> None:
+        """
+        Start the session. Must be called on the event loop thread.
+
+        Raises:
+            ProfilerBusyError: If another profiler (e.g. a debugger) is already active
+        """
+        if self.profile_format == ProfileFormat.PSTATS:
+            self._profile = cProfile.Profile()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            self._sampler.start()
+
+        self._resume()
+        if self.request_fraction is not None:
+            # Recording starts with the first sampled request; resuming once above makes a busy
+            # cProfile fail here rather than in the middle of a request
+            self._pause()
+
+    def stop(self) -> None:
+        """Stop recording."""
+        if self._in_flight > 0 or self.request_fraction is None:
+            self._pause()
+        self._stopped = True
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def _resume(self) -> None:
+        if self._profile is not None:
+            try:
+                self._profile.enable()
+            except ValueError as e:
+                raise ProfilerBusyError from e
+        if self._sampler is not None:
+            self._sampler.recording = True
+
+    def _pause(self) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.recording = False
+
+    def should_sample(self, path: str) -> bool:
+        """Decide whether the request to the given path is profiled."""
+        if self.request_fraction is None or self._stopped or path.startswith(_EXCLUDED_PATH_PREFIX):
+            return False
+        if self.path_prefix is not None and not path.startswith(self.path_prefix):
+            return False
+
+        # Spread the selected requests evenly instead of drawing random numbers
+        self._credit += self.request_fraction
+        if self._credit < 1:
+            return False
+        self._credit -= 1
+        return True
+
+    def request_started(self) -> None:
+        self.sampled_requests += 1
+        self._in_flight += 1
+        if self._in_flight == 1:
+            self._resume()
+
+    def request_finished(self) -> None:
+        self._in_flight -= 1
+        if self._in_flight == 0 and not self._stopped:
+            self._pause()
+
+    def result(self) -> bytes:
+        """
+        Get the recorded profile.
+
+        Returns:
+            Marshalled pstats data (loadable with ``pstats.Stats(path)``) or collapsed stacks
+        """
+        if self._profile is not None:
+            self._profile.create_stats()
+            return marshal.dumps(self._profile.stats)
+        if self._sampler is not None:
+            return self._sampler.to_collapsed()
+        return b""
+
+
+class RequestProfiler:
+    """Runs at most one profiling session at a time."""
+
+    def __init__(self):
+        self.session: ProfilingSession | None = None
+
+    async def profile(self, seconds: float, session: ProfilingSession) -> bytes:
+        """
+        Record a profile for the given number of seconds.
+
+        Args:
+            seconds: Length of the profiling window
+            session: The session to run
+
+        Returns:
+            The recorded profile, see ``ProfilingSession.result``
+
+        Raises:
+            ProfilerBusyError: If a profiling session is already running
+        """
+        if self.session is not None:
+            raise ProfilerBusyError
+
+        session.start()
+        self.session = session
+        logger.info(
+            "Profiling started",
+            seconds=seconds,
+            format=session.profile_format.value,
+            request_fraction=session.request_fraction,
+            path_prefix=session.path_prefix,
+        )
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.session = None
+            session.stop()
+        logger.info("Profiling finished", sampled_requests=session.sampled_requests)
+        return session.result()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that marks the requests selected by the active profiling session."""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app: ASGIApp = app
+        self.profiler: RequestProfiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session = self.profiler.session
+        if session is None or scope["type"] != "http" or not session.should_sample(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        session.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.request_finished()
+
+
+class EventLoopStallMonitor:
+    """
+    Detects event loop stalls longer than a threshold.
+
+    A heartbeat task on the event loop records when it last ran. A watchdog thread logs the
+    stack of the event loop thread as soon as the heartbeat is older than the threshold, so
+    the blocking code can be identified; the heartbeat logs the total duration once the loop
+    is responsive again.
+    """
+
+    def __init__(self, threshold_seconds: float):
+        """
+        Initialize the monitor.
+
+        Args:
+            threshold_seconds: Stalls longer than this are logged
+        """
+        self.threshold_seconds: float = threshold_seconds
+        self._interval: float = threshold_seconds / 2
+        self._last_beat: float = time.monotonic()
+        self._loop_thread_id: int = 0
+        self._heartbeat_task: asyncio.Task[None] | None = None
+        self._stop: threading.Event = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    async def start(self) -> None:
+        """Start the monitor. Must be called on the event loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        """Stop the monitor."""
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            _ = self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            self._last_beat = before
+            await asyncio.sleep(self._interval)
+            lag = time.monotonic() - before - self._interval
+            if lag > self.threshold_seconds:
+                logger.warning("Event loop stall ended", duration_ms=round(lag * 1000))
+
+    def _watch(self) -> None:
+        reported_beat = 0.0
+        while not self._stop.wait(self._interval):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat - self._interval
+            if blocked > self.threshold_seconds and beat != reported_beat:
+                reported_beat = beat
+                frame = sys._current_frames().get(self._loop_thread_id)
+                logger.warning(
+                    "Event loop stalled",
+                    blocked_ms=round(blocked * 1000),
+                    stack="".join(traceback.format_stack(frame)) if frame is not None else None,
+                )
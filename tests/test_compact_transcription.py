@@ -0,0 +1,91 @@
+import json
+from typing import Any
+
+import pytest
+
+from bericht_backend.models.compact_transcription import CompactTranscription, MalformedTranscriptionError
+from bericht_backend.models.transcription_response import VerboseTranscriptionResponse
+
+
+def verbose_body() -> dict[str, Any]:
+    words = [
+        {"start": 0.0, "end": 0.5, "word": " Grosse", "probability": 0.9, "speaker": None},
+        {"start": 0.5, "end": 1.0, "word": " Straße", "probability": 0.8, "speaker": None},
+    ]
+    segment = {
+        "id": 0,
+        "seek": 0,
+        "start": 0.0,
+        "end": 1.0,
+        "text": " Grosse Straße",
+        "tokens": [1, 2, 3],
+        "temperature": 0.0,
+        "avg_logprob": -0.2,
+        "compression_ratio": 1.1,
+        "no_speech_prob": 0.01,
+        "words": words,
+        "speaker": None,
+    }
+    return {
+        "task": "transcribe",
+        "language": "de",
+        "duration": 1.0,
+        "text": " Grosse Straße",
+        "words": words,
+        "segments": [segment],
+    }
+
+
+def test_round_trip_matches_pydantic_model():
+    raw = json.dumps(verbose_body())
+
+    compact = CompactTranscription.from_json(raw)
+
+    expected = VerboseTranscriptionResponse.model_validate_json(raw).model_dump(mode="json")
+    assert json.loads(compact.to_json_bytes()) == expected
+    assert compact.to_verbose_response().model_dump(mode="json") == expected
+
+
+def test_replace_text_updates_all_texts():
+    compact = CompactTranscription.from_json(json.dumps(verbose_body()))
+
+    compact.replace_text("ß", "ss")
+
+    body = json.loads(compact.to_json_bytes())
+    assert body["text"] == " Grosse Strasse"
+    assert body["segments"][0]["text"] == " Grosse Strasse"
+    assert [word["word"] for word in body["words"]] == [" Grosse", " Strasse"]
+
+
+@pytest.mark.parametrize(
+    ("field", "path", "value"),
+    [
+        ("language", (), None),
+        ("id", ("segments", 0), None),
+        ("probability", ("segments", 0, "words", 0), None),
+        ("start", ("segments", 0, "words", 0), "null"),
+        ("tokens", ("segments", 0), "null"),
+        ("word", ("segments", 0, "words", 1), 3),
+        # Without a path the value is the whole raw body
+        ("body", None, "<html><body>502 Bad Gateway</body></html>"),
+        ("body", None, "[1, 2]"),
+    ],
+)
+def test_malformed_body_names_the_field(field: str, path: tuple[str | int, ...] | None, value: Any):
+    if path is None:
+        raw = value
+    else:
+        body = verbose_body()
+        target: Any = body
+        for key in path:
+            target = target[key]
+        if value is None:
+            del target[field]
+        else:
+            target[field] = None if value == "null" else value
+        raw = json.dumps(body)
+
+    with pytest.raises(MalformedTranscriptionError) as error:
+        _ = CompactTranscription.from_json(raw)
+
+    assert error.value.field == field
@@ -0,0 +1,178 @@
+import asyncio
+import pstats
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pydantic import SecretStr
+
+from bericht_backend.models.profile_format import ProfileFormat
+from bericht_backend.utils import profiling
+from bericht_backend.utils.profiling import (
+    EventLoopStallMonitor,
+    ProfilerBusyError,
+    ProfilingSession,
+    RequestProfiler,
+)
+
+
+class RecordingLogger:
+    """Collects log calls instead of sending them through structlog."""
+
+    def __init__(self):
+        self.entries: list[tuple[str, dict[str, Any]]] = []
+
+    def info(self, event: str, **kwargs: Any) -> None:
+        self.entries.append((event, kwargs))
+
+    def warning(self, event: str, **kwargs: Any) -> None:
+        self.entries.append((event, kwargs))
+
+    def events(self) -> list[str]:
+        return [event for event, _ in self.entries]
+
+
+@pytest.fixture
+def log(monkeypatch: pytest.MonkeyPatch) -> RecordingLogger:
+    recording = RecordingLogger()
+    monkeypatch.setattr(profiling, "logger", recording)
+    return recording
+
+
+def test_fraction_spreads_sampled_requests_evenly():
+    session = ProfilingSession(ProfileFormat.COLLAPSED, request_fraction=0.25)
+    selected = [session.should_sample("/stt") for _ in range(100)]
+    assert sum(selected) == 25
+    assert selected[:8] == [False, False, False, True] * 2
+
+
+def test_path_prefix_and_admin_paths_are_not_sampled():
+    session = ProfilingSession(ProfileFormat.COLLAPSED, request_fraction=1, path_prefix="/stt")
+    assert session.should_sample("/stt")
+    assert not session.should_sample("/title")
+
+    session = ProfilingSession(ProfileFormat.COLLAPSED, request_fraction=1)
+    assert not session.should_sample("/admin/profile")
+    assert session.should_sample("/title")
+
+
+def test_without_fraction_no_request_is_sampled():
+    session = ProfilingSession(ProfileFormat.COLLAPSED)
+    assert not session.should_sample("/stt")
+
+
+def test_recording_follows_overlapping_requests():
+    session = ProfilingSession(ProfileFormat.COLLAPSED, request_fraction=1, sample_interval=0.001)
+    session.start()
+    sampler = session._sampler
+    assert sampler is not None
+    try:
+        assert not sampler.recording
+        session.request_started()
+        session.request_started()
+        assert sampler.recording
+        session.request_finished()
+        assert sampler.recording
+        session.request_finished()
+        assert not sampler.recording
+        assert session.sampled_requests == 2
+    finally:
+        session.stop()
+
+
+def test_stop_while_request_in_flight():
+    session = ProfilingSession(ProfileFormat.COLLAPSED, request_fraction=1, sample_interval=0.001)
+    session.start()
+    session.request_started()
+    session.stop()
+    sampler = session._sampler
+    assert sampler is not None
+    assert not sampler.recording
+    assert not session.should_sample("/stt")
+
+    # The request finishing after the window must not resume recording
+    session.request_finished()
+    assert not sampler.recording
+
+
+def test_second_session_is_rejected(log: RecordingLogger):
+    async def scenario():
+        profiler = RequestProfiler()
+        first = asyncio.create_task(profiler.profile(0.2, ProfilingSession(ProfileFormat.COLLAPSED)))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ProfilerBusyError):
+            _ = await profiler.profile(0.1, ProfilingSession(ProfileFormat.COLLAPSED))
+        _ = await first
+        assert profiler.session is None
+
+    asyncio.run(scenario())
+    assert log.events() == ["Profiling started", "Profiling finished"]
+
+
+def busy() -> int:
+    return sum(i * i for i in range(10_000))
+
+
+def test_pstats_result_loads(tmp_path: Path, log: RecordingLogger):
+    async def scenario() -> bytes:
+        profiler = RequestProfiler()
+        task = asyncio.create_task(profiler.profile(0.1, ProfilingSession(ProfileFormat.PSTATS)))
+        await asyncio.sleep(0.01)
+        _ = busy()
+        return await task
+
+    path = tmp_path / "profile.pstats"
+    _ = path.write_bytes(asyncio.run(scenario()))
+    stats = pstats.Stats(str(path))
+    assert any(function == "busy" for _, _, function in stats.stats)  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def test_stall_monitor_logs_blocking_call(log: RecordingLogger):
+    async def scenario():
+        monitor = EventLoopStallMonitor(threshold_seconds=0.05)
+        await monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)  # Blocks the event loop
+        await asyncio.sleep(0.1)
+        await monitor.close()
+
+    asyncio.run(scenario())
+    assert "Event loop stalled" in log.events()
+    assert "Event loop stall ended" in log.events()
+    stalled = next(kwargs for event, kwargs in log.entries if event == "Event loop stalled")
+    assert "time.sleep(0.3)" in stalled["stack"]
+
+
+@pytest.fixture
+def admin_client(monkeypatch: pytest.MonkeyPatch) -> Any:
+    app_module = pytest.importorskip("bericht_backend.app")
+    testclient = pytest.importorskip("fastapi.testclient")
+    monkeypatch.setattr(app_module.config, "admin_token", SecretStr("secret"))
+    return testclient.TestClient(app_module.app), app_module
+
+
+def test_admin_endpoints_disabled_without_token(admin_client: Any, monkeypatch: pytest.MonkeyPatch):
+    client, app_module = admin_client
+    monkeypatch.setattr(app_module.config, "admin_token", None)
+    response = client.get("/admin/profile", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 404
+
+
+def test_admin_endpoints_reject_wrong_token(admin_client: Any):
+    client, _ = admin_client
+    assert client.get("/admin/profile", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/profile").status_code == 403
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"format": "collapsed", "path": "/stt"},
+        {"format": "pstats", "fraction": 0.5},
+    ],
+)
+def test_profile_rejects_invalid_filters(admin_client: Any, params: dict[str, Any]):
+    client, _ = admin_client
+    response = client.get("/admin/profile", params=params, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 400
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from typing import cast
+
+import pytest
+
+# The title generation service pulls in the LLM stack
+_ = pytest.importorskip("llama_index")
+
+from bericht_backend.services.title_generation_service import TitleGenerationService  # noqa: E402
+from bericht_backend.services.title_precompute_service import TitlePrecomputeService  # noqa: E402
+
+
+class FakeTitleGenerator:
+    """Counts the generated titles and optionally fails or blocks until released."""
+
+    def __init__(self, fail: bool = False):
+        self.fail: bool = fail
+        self.calls: int = 0
+        self.release: threading.Event = threading.Event()
+        self.release.set()
+
+    def generate_title(self, text: str) -> str:
+        self.calls += 1
+        _ = self.release.wait(5)
+        if self.fail:
+            raise RuntimeError
+        return f"Title {self.calls}: {text}"
+
+
+def make_service(generator: FakeTitleGenerator, max_concurrency: int = 2) -> TitlePrecomputeService:
+    return TitlePrecomputeService(cast(TitleGenerationService, generator), max_concurrency=max_concurrency)
+
+
+def test_precomputed_title_is_served_once():
+    async def scenario():
+        generator = FakeTitleGenerator()
+        service = make_service(generator)
+        service.schedule("Protokoll der Sitzung")
+        assert await service.get_title("Protokoll der Sitzung") == "Title 1: Protokoll der Sitzung"
+        assert generator.calls == 1
+        # Regenerating must not return the same title again
+        assert await service.get_title("Protokoll der Sitzung") == "Title 2: Protokoll der Sitzung"
+
+    asyncio.run(scenario())
+
+
+def test_title_request_waits_for_running_generation():
+    async def scenario():
+        generator = FakeTitleGenerator()
+        generator.release.clear()
+        service = make_service(generator)
+        service.schedule("Text")
+        request = asyncio.create_task(service.get_title("Text"))
+        await asyncio.sleep(0.05)
+        generator.release.set()
+        assert await request == "Title 1: Text"
+        assert generator.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_precomputation_is_dropped_and_rescheduled():
+    async def scenario():
+        generator = FakeTitleGenerator(fail=True)
+        service = make_service(generator)
+        service.schedule("Text")
+        await asyncio.sleep(0.1)
+        assert not service._titles
+
+        generator.fail = False
+        service.schedule("Text")
+        assert await service.get_title("Text") == "Title 2: Text"
+        assert generator.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_schedule_skips_when_busy():
+    async def scenario():
+        generator = FakeTitleGenerator()
+        generator.release.clear()
+        service = make_service(generator, max_concurrency=1)
+        service.schedule("First")
+        service.schedule("Second")
+        assert len(service._titles) == 1
+        generator.release.set()
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_request_keeps_running_generation():
+    async def scenario():
+        generator = FakeTitleGenerator()
+        generator.release.clear()
+        service = make_service(generator)
+        service.schedule("Text")
+        first = asyncio.create_task(service.get_title("Text"))
+        await asyncio.sleep(0.05)
+        # The client disconnects, its retry must reuse the running generation
+        _ = first.cancel()
+        retry = asyncio.create_task(service.get_title("Text"))
+        await asyncio.sleep(0.05)
+        generator.release.set()
+        assert await retry == "Title 1: Text"
+        assert generator.calls == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from bericht_backend.services.whisper_pool import NoWhisperBackendError, WhisperPool
+
+TRANSCRIPTIONS_PATH = "/audio/transcriptions"
+
+
+class StubWhisper:
+    """Local Whisper stand-in that handles one transcription at a time, like a GPU node."""
+
+    def __init__(self, delay: float = 0.0, status: int = 200, healthy: bool = True):
+        self.delay: float = delay
+        self.status: int = status
+        self.healthy: bool = healthy
+        self.hits: int = 0
+        self.url: str = ""
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def transcribe(self, request: web.Request) -> web.Response:
+        _ = await request.post()
+        self.hits += 1
+        if self.status != 200:
+            return web.Response(status=self.status)
+        async with self._lock:
+            await asyncio.sleep(self.delay)
+        return web.json_response({"text": self.url})
+
+    async def ready(self, _: web.Request) -> web.Response:
+        return web.Response(status=200 if self.healthy else 503)
+
+
+@asynccontextmanager
+async def serve(stub: StubWhisper) -> AsyncIterator[StubWhisper]:
+    app = web.Application()
+    _ = app.router.add_post(f"/v1{TRANSCRIPTIONS_PATH}", stub.transcribe)
+    _ = app.router.add_get("/readyz", stub.ready)
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    stub.url = f"http://127.0.0.1:{port}/v1"
+    try:
+        yield stub
+    finally:
+        await runner.cleanup()
+
+
+@asynccontextmanager
+async def serve_all(*stubs: StubWhisper) -> AsyncIterator[list[StubWhisper]]:
+    async with AsyncExitStack() as stack:
+        yield [await stack.enter_async_context(serve(stub)) for stub in stubs]
+
+
+def build_form() -> aiohttp.FormData:
+    form_data = aiohttp.FormData()
+    form_data.add_field("file", b"audio", filename="audio.wav")
+    return form_data
+
+
+async def read_text(response: aiohttp.ClientResponse) -> str:
+    return (await response.json())["text"]
+
+
+async def transcribe(pool: WhisperPool, input_bytes: int = 100_000) -> str:
+    return await pool.post(TRANSCRIPTIONS_PATH, build_form, read_text, input_bytes)
+
+
+def test_spreads_requests_over_least_outstanding_backends():
+    async def scenario():
+        async with serve_all(*(StubWhisper(delay=0.1) for _ in range(3))) as stubs:
+            pool = WhisperPool([stub.url for stub in stubs])
+            try:
+                start = time.monotonic()
+                _ = await asyncio.gather(*(transcribe(pool) for _ in range(9)))
+                elapsed = time.monotonic() - start
+            finally:
+                await pool.close()
+
+        assert [stub.hits for stub in stubs] == [3, 3, 3]
+        # Serially on one node this would take 0.9s
+        assert elapsed < 0.6
+
+    asyncio.run(scenario())
+
+
+def test_ejects_backend_after_max_failures():
+    async def scenario():
+        async with serve_all(StubWhisper(), StubWhisper(status=503)) as (good, bad):
+            pool = WhisperPool([good.url, bad.url], max_failures=2, ejection_seconds=60)
+            try:
+                results = [await transcribe(pool) for _ in range(6)]
+            finally:
+                await pool.close()
+
+        # Failed requests are retried on the healthy backend
+        assert results == [good.url] * 6
+        assert bad.hits == 2
+        assert pool.backends[1].ejected_until > time.monotonic()
+
+    asyncio.run(scenario())
+
+
+def test_does_not_retry_client_errors():
+    async def scenario():
+        async with serve_all(StubWhisper(status=400), StubWhisper(status=400)) as stubs:
+            pool = WhisperPool([stub.url for stub in stubs])
+            try:
+                with pytest.raises(aiohttp.ClientResponseError) as error:
+                    _ = await transcribe(pool)
+            finally:
+                await pool.close()
+
+        assert error.value.status == 400
+        assert sum(stub.hits for stub in stubs) == 1
+        assert all(backend.consecutive_failures == 0 for backend in pool.backends)
+
+    asyncio.run(scenario())
+
+
+def test_check_health_marks_backends():
+    async def scenario():
+        async with serve_all(StubWhisper(), StubWhisper(healthy=False)) as (healthy, unhealthy):
+            pool = WhisperPool([healthy.url, unhealthy.url, "http://127.0.0.1:9/v1"])
+            try:
+                await pool.check_health()
+                assert [backend.healthy for backend in pool.backends] == [True, False, False]
+
+                results = {await transcribe(pool) for _ in range(4)}
+                assert results == {healthy.url}
+
+                unhealthy.healthy = True
+                await pool.check_health()
+                assert pool.backends[1].healthy
+            finally:
+                await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_fails_open_when_every_backend_is_down():
+    async def scenario():
+        async with serve_all(StubWhisper(healthy=False), StubWhisper(healthy=False)) as stubs:
+            pool = WhisperPool([stub.url for stub in stubs])
+            try:
+                await pool.check_health()
+                assert not any(backend.healthy for backend in pool.backends)
+
+                # The health check may be wrong, so the request is still attempted
+                assert await transcribe(pool) in {stub.url for stub in stubs}
+            finally:
+                await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_raises_without_backends():
+    async def scenario():
+        pool = WhisperPool([])
+        try:
+            with pytest.raises(NoWhisperBackendError):
+                _ = await transcribe(pool)
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_hedged_request_beats_slow_backend():
+    async def scenario():
+        async with serve_all(StubWhisper(delay=2.0), StubWhisper(delay=0.05)) as (slow, fast):
+            pool = WhisperPool([slow.url, fast.url], hedge_percentile=90)
+            # Pretend recent requests took 0.5 s per MB, so a 0.1 MB request is hedged after 50 ms
+            pool._latencies.extend([0.5] * 50)  # pyright: ignore[reportPrivateUsage]
+            try:
+                start = time.monotonic()
+                results = [await transcribe(pool, input_bytes=100_000) for _ in range(4)]
+                elapsed = time.monotonic() - start
+            finally:
+                await pool.close()
+
+        assert results == [fast.url] * 4
+        assert elapsed < 1.5
+
+    asyncio.run(scenario())
+
+
+def test_hedge_delay_scales_with_input_size():
+    pool = WhisperPool(["http://a/v1", "http://b/v1"], hedge_percentile=95)
+    pool._latencies.extend([1.0] * 50)  # pyright: ignore[reportPrivateUsage]
+
+    assert pool.hedge_delay(1_000_000) == pytest.approx(1.0)
+    assert pool.hedge_delay(10_000_000) == pytest.approx(10.0)
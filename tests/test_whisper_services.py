@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+# The service module loads the configuration, which pulls in the LLM stack
+_ = pytest.importorskip("llm_facade")
+
+from bericht_backend.models.response_format import ResponseFormat  # noqa: E402
+from bericht_backend.services import whisper_services  # noqa: E402
+from bericht_backend.services.whisper_pool import WhisperPool  # noqa: E402
+
+VERBOSE_BODY = {
+    "task": "transcribe",
+    "language": "de",
+    "duration": 0.5,
+    "text": " Strasse",
+    "words": [{"start": 0.0, "end": 0.5, "word": " Strasse", "probability": 0.9}],
+    "segments": [],
+}
+
+
+def test_verbose_transcription_requests_word_timestamps(monkeypatch: pytest.MonkeyPatch):
+    received: dict[str, list[str]] = {}
+
+    async def transcribe(request: web.Request) -> web.Response:
+        form = await request.post()
+        received["response_format"] = [str(value) for value in form.getall("response_format")]
+        received["timestamp_granularities"] = [str(value) for value in form.getall("timestamp_granularities[]", [])]
+        if received["response_format"] == [ResponseFormat.VERBOSE_JSON]:
+            return web.json_response(VERBOSE_BODY)
+        return web.json_response({"text": " Strasse"})
+
+    async def scenario() -> None:
+        app = web.Application()
+        _ = app.router.add_post(f"/v1{whisper_services.TRANSCRIPTIONS_PATH}", transcribe)
+        runner = web.AppRunner(app, shutdown_timeout=0.1)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        pool = WhisperPool([f"http://127.0.0.1:{runner.addresses[0][1]}/v1"])
+        monkeypatch.setattr(whisper_services, "whisper_pool", pool)
+        try:
+            transcription = await whisper_services.speech_to_text_verbose(b"audio")
+            assert json.loads(transcription.to_json_bytes())["words"][0]["word"] == " Strasse"
+            assert received["timestamp_granularities"] == ["word", "segment"]
+
+            _ = await whisper_services.speech_to_text(b"audio")
+            assert received["timestamp_granularities"] == []
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())